@@ -0,0 +1,110 @@
+# Per-station anomaly detection over measurement histories
+import numpy as np
+import pandas as pd
+
+ANOMALY_PARAMETERS = ['NH4', 'BSK5', 'O2', 'PO4']
+
+# Scales a mean absolute deviation to a standard deviation for normal data
+MAD_TO_STD = np.sqrt(np.pi / 2)
+
+
+class StationAnomalyDetector:
+    """Flag readings that depart sharply from their station's own history
+
+    Each (station, parameter) pair keeps an exponentially weighted mean and mean
+    absolute deviation, so every ingested sample costs O(1) time and memory.
+    A reading is scored against the statistics from *before* it arrived:
+
+        z = (x - mean) / (MAD_TO_STD * deviation)
+
+    and flagged when |z| exceeds the threshold once enough history exists.
+    """
+
+    def __init__(self, parameters=ANOMALY_PARAMETERS, alpha=0.2, threshold=3.5, min_samples=5):
+        self.parameters = list(parameters)
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_samples = min_samples
+        # (station, parameter) -> [count, ewma mean, ewma absolute deviation]
+        self._state = {}
+
+    def _score(self, state, value):
+        count, mean, deviation = state
+        if count < self.min_samples or not deviation > 0:
+            return np.nan
+        return (value - mean) / (MAD_TO_STD * deviation)
+
+    def update(self, station_id, date, measurements):
+        """Ingest one row of measurements and return any anomalies it contains"""
+        anomalies = []
+        for parameter in self.parameters:
+            value = measurements.get(parameter)
+            if value is None or pd.isna(value):
+                continue
+
+            state = self._state.get((station_id, parameter))
+            if state is None:
+                self._state[(station_id, parameter)] = [1, float(value), np.nan]
+                continue
+
+            z_score = self._score(state, value)
+            if abs(z_score) > self.threshold:
+                anomalies.append({
+                    'id': station_id,
+                    'date': date,
+                    'parameter': parameter,
+                    'value': value,
+                    'expected': state[1],
+                    'z_score': z_score,
+                })
+
+            count, mean, deviation = state
+            abs_dev = abs(value - mean)
+            state[0] = count + 1
+            state[1] = mean + self.alpha * (value - mean)
+            state[2] = abs_dev if count == 1 else deviation + self.alpha * (abs_dev - deviation)
+        return anomalies
+
+    def backfill(self, df):
+        """Score a whole measurement table at once and return its anomalies
+
+        Produces the same flags as calling update() row by row in date order,
+        and leaves the detector primed to continue streaming from the end of df.
+        """
+        df = df.sort_values(['id', 'date'], kind='stable')
+        frames = []
+        for parameter in self.parameters:
+            series = df[['id', 'date', parameter]].dropna(subset=[parameter])
+            values = series[parameter].astype(float)
+            by_station = values.groupby(series['id'])
+
+            # Same recurrences as update(), evaluated per station with pandas' ewm
+            mean = by_station.transform(lambda s: s.ewm(alpha=self.alpha, adjust=False).mean())
+            prev_mean = mean.groupby(series['id']).shift()
+            abs_dev = (values - prev_mean).abs()
+            deviation = abs_dev.groupby(series['id']).transform(
+                lambda s: s.ewm(alpha=self.alpha, adjust=False, ignore_na=True).mean()
+            )
+            prev_deviation = deviation.groupby(series['id']).shift()
+            count = by_station.cumcount()
+
+            scale = MAD_TO_STD * prev_deviation.where(prev_deviation > 0)
+            z_score = ((values - prev_mean) / scale).where(count >= self.min_samples)
+            flagged = z_score.abs() > self.threshold
+            frames.append(pd.DataFrame({
+                'id': series['id'][flagged],
+                'date': series['date'][flagged],
+                'parameter': parameter,
+                'value': values[flagged],
+                'expected': prev_mean[flagged],
+                'z_score': z_score[flagged],
+            }))
+
+            # Carry the final per-station state over for streaming ingestion
+            last = pd.DataFrame({'count': count + 1, 'mean': mean, 'deviation': deviation})
+            last = last.groupby(series['id']).last()
+            for station_id, row in last.iterrows():
+                self._state[(station_id, parameter)] = [int(row['count']), row['mean'], row['deviation']]
+
+        anomalies = pd.concat(frames, ignore_index=True)
+        return anomalies.sort_values(['date', 'id'], ignore_index=True)
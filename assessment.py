@@ -0,0 +1,129 @@
+# Water quality assessment against drinking water standards
+# WHO/BIS Standards for drinking water
+STANDARDS = {
+    'O2': {'min': 4.0, 'ideal_min': 6.0, 'name': 'Dissolved Oxygen'},
+    'NO3': {'max': 45.0, 'name': 'Nitrate'},
+    'NO2': {'max': 3.0, 'name': 'Nitrite'},
+    'SO4': {'max': 200.0, 'name': 'Sulfate'},
+    'PO4': {'max': 0.1, 'name': 'Phosphate'},
+    'CL': {'max': 250.0, 'name': 'Chloride'},
+    'TDS': {'max': 500.0, 'acceptable_max': 1000.0, 'name': 'Total Dissolved Solids'}
+}
+
+VERDICT_LABELS = {
+    'safe': "SAFE TO DRINK",
+    'conditional': "CONDITIONAL DRINKING",
+    'unsafe': "NOT SAFE TO DRINK",
+}
+
+
+def assess_water_quality(predicted_pollutants, tds_value):
+    """Score predicted pollutants and TDS against the standards and decide drinkability
+
+    predicted_pollutants follows the model's output order: O2, NO3, NO2, SO4, PO4, CL.
+    """
+    quality_score = 0
+    max_score = 7  # Total parameters to check
+    assessments = []
+    drinkability_issues = []
+
+    # Check each parameter against standards
+    # Dissolved Oxygen (higher is better)
+    o2_level = predicted_pollutants[0]
+    if o2_level >= STANDARDS['O2']['ideal_min']:
+        quality_score += 1
+        assessments.append("✅ Excellent oxygen levels - supports aquatic life")
+    elif o2_level >= STANDARDS['O2']['min']:
+        quality_score += 0.5
+        assessments.append("🟡 Adequate oxygen levels")
+    else:
+        assessments.append("❌ Low oxygen levels - poor water quality")
+        drinkability_issues.append("Insufficient dissolved oxygen")
+
+    # Nitrate
+    no3_level = predicted_pollutants[1]
+    if no3_level <= STANDARDS['NO3']['max']:
+        quality_score += 1
+        assessments.append("✅ Safe nitrate levels")
+    else:
+        assessments.append("❌ High nitrate levels - health risk")
+        drinkability_issues.append("Nitrate exceeds safe limits")
+
+    # Nitrite
+    no2_level = predicted_pollutants[2]
+    if no2_level <= STANDARDS['NO2']['max']:
+        quality_score += 1
+        assessments.append("✅ Safe nitrite levels")
+    else:
+        assessments.append("❌ High nitrite levels - health risk")
+        drinkability_issues.append("Nitrite exceeds safe limits")
+
+    # Sulfate
+    so4_level = predicted_pollutants[3]
+    if so4_level <= STANDARDS['SO4']['max']:
+        quality_score += 1
+        assessments.append("✅ Acceptable sulfate levels")
+    else:
+        assessments.append("❌ High sulfate levels - may cause digestive issues")
+        drinkability_issues.append("Sulfate exceeds recommended limits")
+
+    # Phosphate
+    po4_level = predicted_pollutants[4]
+    if po4_level <= STANDARDS['PO4']['max']:
+        quality_score += 1
+        assessments.append("✅ Low phosphate levels")
+    else:
+        assessments.append("⚠️ Elevated phosphate levels - may indicate pollution")
+        drinkability_issues.append("Phosphate levels elevated")
+
+    # Chloride
+    cl_level = predicted_pollutants[5]
+    if cl_level <= STANDARDS['CL']['max']:
+        quality_score += 1
+        assessments.append("✅ Acceptable chloride levels")
+    else:
+        assessments.append("❌ High chloride levels - taste and corrosion issues")
+        drinkability_issues.append("Chloride exceeds taste threshold")
+
+    # TDS Assessment
+    if tds_value <= STANDARDS['TDS']['max']:
+        quality_score += 1
+        assessments.append("✅ Excellent TDS levels - ideal for drinking")
+    elif tds_value <= STANDARDS['TDS']['acceptable_max']:
+        quality_score += 0.5
+        assessments.append("🟡 Acceptable TDS levels - drinkable but not ideal")
+    else:
+        assessments.append("❌ High TDS levels - poor taste, may require treatment")
+        drinkability_issues.append("TDS exceeds acceptable limits")
+
+    # Drinkability verdict
+    quality_percentage = (quality_score / max_score) * 100
+    if len(drinkability_issues) == 0 and quality_percentage >= 85:
+        verdict = 'safe'
+    elif len(drinkability_issues) <= 2 and quality_percentage >= 60:
+        verdict = 'conditional'
+    else:
+        verdict = 'unsafe'
+
+    return {
+        'quality_score': quality_score,
+        'max_score': max_score,
+        'quality_percentage': quality_percentage,
+        'assessments': assessments,
+        'drinkability_issues': drinkability_issues,
+        'verdict': verdict,
+    }
+
+
+def classify_tds(tds_value):
+    """Return the alert level and label for a TDS concentration"""
+    if tds_value < 150:
+        return 'info', "Low mineralization"
+    elif tds_value < 300:
+        return 'success', "Optimal for drinking"
+    elif tds_value < 500:
+        return 'warning', "Acceptable"
+    elif tds_value < 1000:
+        return 'warning', "Poor taste"
+    else:
+        return 'error', "Unacceptable for drinking"
@@ -0,0 +1,106 @@
+# Process-wide cached resources shared by the dashboard and the warm-up job
+import contextlib
+import logging
+import threading
+
+import streamlit as st
+from streamlit.runtime import Runtime
+
+from anomalies import StationAnomalyDetector
+from climatology import Climatology
+from correlation import CorrelationEngine
+from forecast import POLLUTANTS, load_forecast_model
+from similarity import StationIndex, station_profiles
+from stations import add_station_info, load_measurements
+
+DEFAULT_ANOMALY_THRESHOLD = 3.5
+
+# Streamlit warns on every cache call made outside a script run, as warm-up threads and bare-mode tools do
+BARE_MODE_LOGGERS = ("streamlit.runtime.scriptrunner_utils.script_run_context", "streamlit.runtime.caching.cache_data_api")
+
+
+class _BareModeFilter(logging.Filter):
+    """Drop Streamlit's bare-mode warnings without a server, or on threads inside quiet_bare_mode()"""
+
+    def __init__(self):
+        super().__init__()
+        self.local = threading.local()
+
+    def filter(self, record):
+        return Runtime.exists() and not getattr(self.local, 'depth', 0)
+
+
+_bare_mode_filter = _BareModeFilter()
+for _name in BARE_MODE_LOGGERS:
+    logging.getLogger(_name).addFilter(_bare_mode_filter)
+
+
+@contextlib.contextmanager
+def quiet_bare_mode():
+    """Silence missing-ScriptRunContext warnings raised by the current thread"""
+    local = _bare_mode_filter.local
+    local.depth = getattr(local, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        local.depth -= 1
+
+
+@st.cache_resource
+def get_forecast_model():
+    """Trained pollution model and its station encoder"""
+    return load_forecast_model()
+
+
+@st.cache_data
+def get_measurements():
+    """Raw measurement table with the sample year"""
+    return load_measurements()
+
+
+@st.cache_data
+def get_enhanced_measurements():
+    """Measurements with state, city and location attached"""
+    return add_station_info(get_measurements())
+
+
+@st.cache_data
+def get_station_means():
+    """Mean pollutant levels per station"""
+    return get_enhanced_measurements().groupby(['id', 'state', 'city', 'location'])[POLLUTANTS].mean().reset_index()
+
+
+# Backfill anomaly flags over the full measurement history
+@st.cache_data
+def detect_anomalies(data, threshold=DEFAULT_ANOMALY_THRESHOLD):
+    """Score every measurement against its station's rolling history"""
+    detector = StationAnomalyDetector(threshold=threshold)
+    return detector.backfill(data)
+
+
+# Prebuild the station similarity index once per dataset
+@st.cache_resource
+def build_station_index(data):
+    """Embed every station's pollutant profile into a nearest-neighbour index"""
+    return StationIndex(station_profiles(data))
+
+
+# Precompute monthly per-station climatology arrays
+@st.cache_resource
+def build_climatology(data):
+    """Fold the measurement history into per-station, per-month statistics"""
+    return Climatology.from_measurements(data)
+
+
+# Keep pairwise running moments per station and year
+@st.cache_resource
+def build_correlation_engine(data):
+    """Fold the measurement history into mergeable correlation moments"""
+    return CorrelationEngine.from_measurements(data)
+
+
+def clear_all():
+    """Drop every cached entry so the next access rebuilds from disk"""
+    for cached in (get_forecast_model, get_measurements, get_enhanced_measurements, get_station_means,
+                   detect_anomalies, build_station_index, build_climatology, build_correlation_engine):
+        cached.clear()
@@ -0,0 +1,235 @@
+# Precomputed per-station monthly climatology
+import numpy as np
+import pandas as pd
+
+from stations import MEASURED_PARAMETERS
+
+CLIMATOLOGY_PARAMETERS = MEASURED_PARAMETERS
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Readings kept exactly per (station, month, parameter) cell before it spills into a histogram
+EXACT_SAMPLES = 32
+# Log-spaced histogram bins (16 per decade) covering every concentration in mg/L
+BIN_EDGES = np.logspace(-4, 5, 9 * 16 + 1)
+
+
+def _bins(values):
+    return np.clip(np.searchsorted(BIN_EDGES, values, side='right') - 1, 0, len(BIN_EDGES) - 2)
+
+
+class Climatology:
+    """Monthly statistics per station and parameter, held in compact numpy arrays
+
+    The arrays cover only stations with measurements and grow as new stations
+    report. Every (station, month, parameter) cell keeps a sample count and a
+    running sum, so means are exact, and its first EXACT_SAMPLES readings, so
+    percentiles match np.quantile. A cell that outgrows that buffer spills into
+    a log-binned histogram row and its percentiles are interpolated within a
+    bin from then on. New measurements are folded in without rescanning
+    history, and cells from several stations merge by concatenation or
+    summation.
+    """
+
+    def __init__(self, station_ids=(), parameters=CLIMATOLOGY_PARAMETERS):
+        self.station_ids = np.array(sorted(station_ids), dtype=np.int64)
+        self.parameters = list(parameters)
+        shape = (len(self.station_ids), 12, len(self.parameters))
+        self.counts = np.zeros(shape, dtype=np.int64)
+        self.sums = np.zeros(shape)
+        self.samples = np.full(shape + (EXACT_SAMPLES,), np.nan)
+        # Row of each spilled cell in `histograms` (-1 while its readings are kept exactly)
+        self.histogram_rows = np.full(shape, -1, dtype=np.int64)
+        self.histograms = np.zeros((0, len(BIN_EDGES) - 1), dtype=np.uint32)
+        # Most recent reading per (station, parameter) for "current vs normal"
+        self.latest_dates = np.full(shape[:1] + shape[2:], np.datetime64('NaT'), dtype='datetime64[D]')
+        self.latest_values = np.full(shape[:1] + shape[2:], np.nan)
+
+    @classmethod
+    def from_measurements(cls, df, **kwargs):
+        climatology = cls(**kwargs)
+        climatology.update(df)
+        return climatology
+
+    def _rows(self, station_ids):
+        rows = np.searchsorted(self.station_ids, station_ids)
+        rows = np.clip(rows, 0, max(len(self.station_ids) - 1, 0))
+        if len(self.station_ids) == 0:
+            return rows, np.zeros(len(rows), dtype=bool)
+        return rows, self.station_ids[rows] == station_ids
+
+    def _add_stations(self, station_ids):
+        """Insert empty cells for stations seen for the first time"""
+        new_ids = np.setdiff1d(station_ids, self.station_ids)
+        if len(new_ids) == 0:
+            return
+        positions = np.searchsorted(self.station_ids, new_ids)
+        self.station_ids = np.insert(self.station_ids, positions, new_ids)
+        for name, fill in (('counts', 0), ('sums', 0), ('samples', np.nan), ('histogram_rows', -1),
+                           ('latest_dates', np.datetime64('NaT')), ('latest_values', np.nan)):
+            setattr(self, name, np.insert(getattr(self, name), positions, fill, axis=0))
+
+    def update(self, df):
+        """Fold new measurement rows (id, date and parameter columns) into the climatology"""
+        station_ids = df['id'].to_numpy(dtype=np.int64)
+        self._add_stations(np.unique(station_ids))
+        rows = np.searchsorted(self.station_ids, station_ids)
+        months = df['date'].dt.month.to_numpy() - 1
+        dates = df['date'].to_numpy().astype('datetime64[D]')
+
+        for p, parameter in enumerate(self.parameters):
+            values = df[parameter].to_numpy(dtype=float)
+            valid = ~np.isnan(values)
+            r, m, v, d = rows[valid], months[valid], values[valid], dates[valid]
+
+            self._add_samples(r, m, p, v)
+            np.add.at(self.sums[:, :, p], (r, m), v)
+
+            # Keep the newest reading per station, including ones already stored
+            order = np.lexsort((d, r))
+            last = np.r_[r[order][1:] != r[order][:-1], True]
+            newest_r, newest_d, newest_v = r[order][last], d[order][last], v[order][last]
+            current = self.latest_dates[newest_r, p]
+            newer = np.isnat(current) | (newest_d >= current)
+            self.latest_dates[newest_r[newer], p] = newest_d[newer]
+            self.latest_values[newest_r[newer], p] = newest_v[newer]
+
+    def _add_samples(self, r, m, p, v):
+        """Store readings in their cells' exact buffers, spilling full cells into histograms"""
+        # Slot of each reading: the cell's stored count plus its order within this batch
+        cells = r * 12 + m
+        order = np.argsort(cells, kind='stable')
+        first = np.r_[True, cells[order][1:] != cells[order][:-1]]
+        group_start = np.maximum.accumulate(np.where(first, np.arange(len(cells)), 0))
+        rank = np.empty(len(cells), dtype=np.int64)
+        rank[order] = np.arange(len(cells)) - group_start
+        slots = self.counts[r, m, p] + rank
+        np.add.at(self.counts[:, :, p], (r, m), 1)
+
+        exact = (slots < EXACT_SAMPLES) & (self.histogram_rows[r, m, p] < 0)
+        self.samples[r[exact], m[exact], p, slots[exact]] = v[exact]
+        if exact.all():
+            return
+
+        # Cells that just outgrew their buffer move their stored readings into new histogram rows
+        spilling = np.unique(cells[~exact & (self.histogram_rows[r, m, p] < 0)])
+        sr, sm = spilling // 12, spilling % 12
+        self.histogram_rows[sr, sm, p] = np.arange(len(self.histograms), len(self.histograms) + len(spilling))
+        self.histograms = np.vstack([self.histograms, np.zeros((len(spilling), len(BIN_EDGES) - 1), dtype=np.uint32)])
+        stored = self.samples[sr, sm, p]
+        kept = ~np.isnan(stored)
+        np.add.at(self.histograms, (np.repeat(self.histogram_rows[sr, sm, p], kept.sum(axis=1)), _bins(stored[kept])), 1)
+        self.samples[sr, sm, p] = np.nan
+        np.add.at(self.histograms, (self.histogram_rows[r[~exact], m[~exact], p], _bins(v[~exact])), 1)
+
+    def _select(self, station_ids):
+        """Rows for the given stations (all stations when None)"""
+        if station_ids is None:
+            return slice(None)
+        rows, known = self._rows(np.atleast_1d(station_ids))
+        return rows[known]
+
+    def _aggregate(self, station_ids, parameter):
+        """Per-month counts, sums, stored readings (NaN padded) and histogram rows of the selected cells"""
+        rows = self._select(station_ids)
+        p = self.parameters.index(parameter)
+        counts = self.counts[rows, :, p].reshape(-1, 12).sum(axis=0)
+        sums = self.sums[rows, :, p].reshape(-1, 12).sum(axis=0)
+        samples = np.moveaxis(self.samples[rows, :, p], 1, 0).reshape(12, -1)
+        histogram_rows = self.histogram_rows[rows, :, p].reshape(-1, 12)
+        return counts, sums, samples, histogram_rows
+
+    def _month_histograms(self, samples, histogram_rows):
+        """Per-month histograms of the selected cells, binning their stored readings as well"""
+        histograms = np.zeros((12, len(BIN_EDGES) - 1), dtype=np.int64)
+        cells, months = np.nonzero(histogram_rows >= 0)
+        np.add.at(histograms, months, self.histograms[histogram_rows[cells, months]])
+        months, columns = np.nonzero(~np.isnan(samples))
+        np.add.at(histograms, (months, _bins(samples[months, columns])), 1)
+        return histograms
+
+    @staticmethod
+    def _histogram_quantiles(histograms, quantiles):
+        """Interpolate quantiles (in log space within a bin) from per-month histograms"""
+        cumulative = np.cumsum(histograms, axis=-1)
+        totals = cumulative[:, -1:]
+        log_edges = np.log10(BIN_EDGES)
+        result = np.full((histograms.shape[0], len(quantiles)), np.nan)
+        for j, q in enumerate(quantiles):
+            target = q * totals
+            idx = np.minimum((cumulative < target).sum(axis=-1), histograms.shape[-1] - 1)
+            below = np.take_along_axis(cumulative, idx[:, None], axis=-1) - np.take_along_axis(histograms, idx[:, None], axis=-1)
+            in_bin = np.take_along_axis(histograms, idx[:, None], axis=-1)
+            fraction = np.divide(target - below, in_bin, out=np.zeros_like(target, dtype=float), where=in_bin > 0)
+            values = 10 ** (log_edges[idx] + fraction[:, 0] * (log_edges[idx + 1] - log_edges[idx]))
+            result[:, j] = np.where(totals[:, 0] > 0, values, np.nan)
+        return result
+
+    def _quantiles(self, counts, samples, histogram_rows, quantiles):
+        """Exact quantiles for months whose cells all kept their readings, histogram estimates otherwise"""
+        result = np.full((12, len(quantiles)), np.nan)
+        exact = (histogram_rows < 0).all(axis=0)
+        months = exact & (counts > 0)
+        if months.any():
+            result[months] = np.nanquantile(samples[months], quantiles, axis=1).T
+        if not exact.all():
+            result[~exact] = self._histogram_quantiles(self._month_histograms(samples, histogram_rows)[~exact], quantiles)
+        return result
+
+    def monthly_summary(self, parameter, station_ids=None, quantiles=(0.1, 0.5, 0.9)):
+        """Count, mean and percentiles of a parameter for each calendar month"""
+        counts, sums, samples, histogram_rows = self._aggregate(station_ids, parameter)
+        summary = pd.DataFrame({
+            'month': np.arange(1, 13),
+            'month_name': MONTH_NAMES,
+            'count': counts,
+            'mean': np.divide(sums, counts, out=np.full(12, np.nan), where=counts > 0),
+        })
+        percentiles = self._quantiles(counts, samples, histogram_rows, quantiles)
+        for j, q in enumerate(quantiles):
+            summary[f'p{int(q * 100)}'] = percentiles[:, j]
+        return summary
+
+    def percentile_rank(self, parameter, month, value, station_ids=None):
+        """Share of the month's historical readings at or below value (0-100)"""
+        counts, _, samples, histogram_rows = self._aggregate(station_ids, parameter)
+        total = counts[month - 1]
+        if total == 0:
+            return np.nan
+        if (histogram_rows[:, month - 1] < 0).all():
+            return 100 * np.sum(samples[month - 1] <= value) / total
+        histogram = self._month_histograms(samples, histogram_rows)[month - 1]
+        bin_index = np.clip(np.searchsorted(BIN_EDGES, value, side='right') - 1, 0, len(histogram) - 1)
+        log_edges = np.log10(BIN_EDGES)
+        fraction = np.clip((np.log10(max(value, BIN_EDGES[0])) - log_edges[bin_index]) / (log_edges[bin_index + 1] - log_edges[bin_index]), 0, 1)
+        return 100 * (histogram[:bin_index].sum() + fraction * histogram[bin_index]) / total
+
+    def latest(self, station_id, parameter):
+        """Date and value of the station's most recent reading of parameter"""
+        rows = self._select(station_id)
+        if len(rows) == 0:
+            return None, np.nan
+        p = self.parameters.index(parameter)
+        date = self.latest_dates[rows[0], p]
+        return (None if np.isnat(date) else pd.Timestamp(date)), self.latest_values[rows[0], p]
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            station_ids=self.station_ids,
+            parameters=np.array(self.parameters),
+            counts=self.counts,
+            sums=self.sums,
+            samples=self.samples,
+            histogram_rows=self.histogram_rows,
+            histograms=self.histograms,
+            latest_dates=self.latest_dates,
+            latest_values=self.latest_values,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            climatology = cls(station_ids=arrays['station_ids'], parameters=arrays['parameters'].tolist())
+            for name in ('counts', 'sums', 'samples', 'histogram_rows', 'histograms', 'latest_dates', 'latest_values'):
+                setattr(climatology, name, arrays[name])
+        return climatology
@@ -0,0 +1,138 @@
+# Streaming correlation and covariance over mergeable running moments
+import numpy as np
+import pandas as pd
+
+from stations import MEASURED_PARAMETERS, STATION_MAPPING
+
+
+class PairwiseMoments:
+    """Welford-style running moments for every pair of parameters
+
+    Missing readings are handled pairwise, like DataFrame.corr(): for each pair
+    (i, j) only rows where both are present count. Entry [i, j] of `means` and
+    `m2` refers to parameter i over the rows shared with j, and `comoment`
+    holds the centred cross products. Moments from disjoint row sets merge
+    exactly (Chan et al.), so partial results can be combined in any order.
+    """
+
+    def __init__(self, n_parameters):
+        shape = (n_parameters, n_parameters)
+        self.count = np.zeros(shape)
+        self.means = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.comoment = np.zeros(shape)
+
+    @classmethod
+    def from_values(cls, values):
+        """Moments of a block of rows (NaN marks a missing reading)"""
+        values = np.asarray(values, dtype=float)
+        moments = cls(values.shape[1])
+        present = ~np.isnan(values)
+        weights = present.astype(float)
+        # Shift by the column means so the sums below do not cancel catastrophically
+        shift = np.nanmean(np.where(present.any(axis=0), values, 0), axis=0) if len(values) else 0
+        centred = np.where(present, values - shift, 0.0)
+
+        count = weights.T @ weights
+        safe_count = np.where(count > 0, count, 1)
+        sums = centred.T @ weights
+        shifted_means = sums / safe_count
+        moments.count = count
+        moments.means = np.where(count > 0, shifted_means + np.reshape(shift, (-1, 1)), 0.0)
+        moments.m2 = np.where(count > 0, (centred ** 2).T @ weights - count * shifted_means ** 2, 0.0)
+        moments.comoment = np.where(count > 0, centred.T @ centred - count * shifted_means * shifted_means.T, 0.0)
+        return moments
+
+    def merge(self, other):
+        """Fold another set of moments into this one in place"""
+        count = self.count + other.count
+        safe_count = np.where(count > 0, count, 1)
+        delta = other.means - self.means
+        weight = self.count * other.count / safe_count
+        self.means = self.means + delta * other.count / safe_count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * weight
+        self.comoment = self.comoment + other.comoment + delta * delta.T * weight
+        self.count = count
+        return self
+
+    @classmethod
+    def combine(cls, moments_list, n_parameters):
+        """Merge many moment sets at once (vectorized over the list)"""
+        combined = cls(n_parameters)
+        if not moments_list:
+            return combined
+        counts = np.stack([m.count for m in moments_list])
+        means = np.stack([m.means for m in moments_list])
+        count = counts.sum(axis=0)
+        safe_count = np.where(count > 0, count, 1)
+        mean = (counts * means).sum(axis=0) / safe_count
+        delta = means - mean
+        combined.count = count
+        combined.means = mean
+        combined.m2 = sum(m.m2 for m in moments_list) + (counts * delta ** 2).sum(axis=0)
+        combined.comoment = sum(m.comoment for m in moments_list) + (counts * delta * delta.transpose(0, 2, 1)).sum(axis=0)
+        return combined
+
+    def covariance(self):
+        """Pairwise sample covariance (NaN where fewer than two shared rows)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, self.comoment / (self.count - 1), np.nan)
+
+    def correlation(self):
+        """Pairwise Pearson correlation (NaN where undefined)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            denominator = np.sqrt(self.m2 * self.m2.T)
+            corr = np.where((self.count > 1) & (denominator > 0), self.comoment / denominator, np.nan)
+        return np.clip(corr, -1, 1)
+
+
+class CorrelationEngine:
+    """Pairwise moments kept per (station, year) cell and combined on demand
+
+    Ingesting rows only touches the cells they fall in; any station, state and
+    year filter is answered by merging the matching cells, never rescanning
+    the measurement history.
+    """
+
+    def __init__(self, parameters=MEASURED_PARAMETERS, station_mapping=STATION_MAPPING):
+        self.parameters = list(parameters)
+        self.station_mapping = station_mapping
+        self.cells = {}
+
+    @classmethod
+    def from_measurements(cls, df, **kwargs):
+        engine = cls(**kwargs)
+        engine.update(df)
+        return engine
+
+    def update(self, df):
+        """Fold new measurement rows (id, year and parameter columns) into their cells"""
+        for key, group in df.groupby(['id', 'year']):
+            moments = PairwiseMoments.from_values(group[self.parameters].to_numpy(dtype=float))
+            key = (int(key[0]), int(key[1]))
+            if key in self.cells:
+                self.cells[key].merge(moments)
+            else:
+                self.cells[key] = moments
+
+    def combine(self, station_ids=None, states=None, years=None):
+        """Merged moments for the cells matching every given filter"""
+        station_ids = set(station_ids) if station_ids else None
+        states = set(states) if states else None
+        years = set(years) if years else None
+        selected = [
+            moments for (sid, year), moments in self.cells.items()
+            if (station_ids is None or sid in station_ids)
+            and (states is None or self.station_mapping[sid]['state'] in states)
+            and (years is None or year in years)
+        ]
+        return PairwiseMoments.combine(selected, len(self.parameters))
+
+    def correlation(self, **filters):
+        return pd.DataFrame(self.combine(**filters).correlation(), index=self.parameters, columns=self.parameters)
+
+    def covariance(self, **filters):
+        return pd.DataFrame(self.combine(**filters).covariance(), index=self.parameters, columns=self.parameters)
+
+    def sample_counts(self, **filters):
+        return pd.DataFrame(self.combine(**filters).count.astype(int), index=self.parameters, columns=self.parameters)
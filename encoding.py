@@ -0,0 +1,98 @@
+# Station one-hot encoding shared by model training and serving
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class StationEncoder:
+    """Encode (year, station id) pairs into the model's feature layout
+
+    The layout is `year` followed by one indicator column per station, with the
+    baseline station (dropped like `get_dummies(drop_first=True)`) encoded as
+    all zeros. A precomputed id -> column lookup table fills dense or CSR
+    buffers directly, for one row or many, without building intermediate
+    frames. Station ids the model never saw raise a ValueError instead of
+    silently falling back to the baseline station's prediction.
+    """
+
+    def __init__(self, station_ids, baseline_id=None):
+        station_ids = sorted({int(sid) for sid in station_ids})
+        self.baseline_id = station_ids[0] if baseline_id is None else int(baseline_id)
+        encoded_ids = [sid for sid in station_ids if sid != self.baseline_id]
+        self.station_ids = sorted(set(encoded_ids) | {self.baseline_id})
+        self.columns = ['year'] + [f'id_{sid}' for sid in encoded_ids]
+
+        # Column per station id: 0 marks the baseline (no indicator set), -1 an unknown id
+        self._lookup = np.full(max(self.station_ids) + 1, -1, dtype=np.intp)
+        self._lookup[self.baseline_id] = 0
+        self._lookup[encoded_ids] = np.arange(1, len(encoded_ids) + 1)
+
+    @classmethod
+    def fit(cls, station_ids):
+        """Learn the layout from training station ids, dropping the first as baseline"""
+        return cls(pd.unique(np.asarray(station_ids, dtype=int)))
+
+    @classmethod
+    def from_columns(cls, columns, baseline_id=1):
+        """Rebuild the encoder of a model saved with only its column list
+
+        The column list does not record the dropped station; models trained
+        with the notebook dropped station 1.
+        """
+        if list(columns[:1]) != ['year'] or not all(col.startswith('id_') for col in columns[1:]):
+            raise ValueError(f"unexpected model columns: {list(columns)}")
+        encoder = cls([baseline_id] + [int(col[3:]) for col in columns[1:]], baseline_id=baseline_id)
+        if encoder.columns != list(columns):
+            raise ValueError("model columns are not in the encoder's station order")
+        return encoder
+
+    def __len__(self):
+        return len(self.columns)
+
+    def knows(self, station_id):
+        """Whether the model was trained with this station"""
+        return 0 <= station_id < len(self._lookup) and self._lookup[station_id] >= 0
+
+    def column_indices(self, station_ids):
+        """Indicator column per station (0 for the baseline); raises on unknown ids"""
+        station_ids = np.asarray(station_ids, dtype=np.intp).reshape(-1)
+        in_range = (station_ids >= 0) & (station_ids < len(self._lookup))
+        indices = np.full(station_ids.shape, -1, dtype=np.intp)
+        indices[in_range] = self._lookup[station_ids[in_range]]
+        if (indices < 0).any():
+            unknown = sorted(set(station_ids[indices < 0].tolist()))
+            raise ValueError(f"no training data for station(s) {unknown}; the model covers stations {self.station_ids}")
+        return indices
+
+    def transform(self, years, station_ids, out=None, dtype=np.float32):
+        """Dense (n_samples, n_features) encoding, written into `out` when given"""
+        years = np.asarray(years).reshape(-1)
+        indices = self.column_indices(station_ids)
+        if out is None:
+            out = np.zeros((len(years), len(self.columns)), dtype=dtype)
+        else:
+            out[...] = 0
+        out[:, 0] = years
+        rows = np.flatnonzero(indices > 0)
+        out[rows, indices[rows]] = 1
+        return out
+
+    def transform_sparse(self, years, station_ids, dtype=np.float32):
+        """CSR encoding with one year entry plus at most one indicator per row"""
+        years = np.asarray(years).reshape(-1)
+        indices = self.column_indices(station_ids)
+        n_samples = len(years)
+        has_station = indices > 0
+
+        # Lay out [year, indicator] pairs per row and drop the baseline rows' indicator slot
+        columns = np.column_stack([np.zeros(n_samples, dtype=np.intp), indices])
+        data = np.column_stack([years.astype(dtype), np.ones(n_samples, dtype=dtype)])
+        keep = np.column_stack([np.ones(n_samples, dtype=bool), has_station])
+        indptr = np.zeros(n_samples + 1, dtype=np.intp)
+        np.cumsum(1 + has_station, out=indptr[1:])
+        return sparse.csr_matrix((data[keep], columns[keep], indptr), shape=(n_samples, len(self.columns)))
+
+    def transform_frame(self, years, station_ids):
+        """DataFrame encoding with named columns, for fitting models with feature names"""
+        index = years.index if isinstance(years, pd.Series) else None
+        return pd.DataFrame(self.transform(years, station_ids, dtype=np.int64), columns=self.columns, index=index)
@@ -0,0 +1,99 @@
+# Forecast helpers shared by the dashboard and offline tools
+import os
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+from encoding import StationEncoder
+
+MODEL_PATH = "pollution_model.pkl"
+MODEL_COLUMNS_PATH = "model_columns.pkl"
+ENCODER_PATH = "station_encoder.pkl"
+
+POLLUTANTS = ['O2', 'NO3', 'NO2', 'SO4', 'PO4', 'CL']
+FORECAST_PARAMETERS = POLLUTANTS + ['TDS']
+
+# Base minerals typically present in water, added on top of the major ions
+TDS_BASE_MINERALS = 50
+
+
+def load_forecast_model(model_path=MODEL_PATH, columns_path=MODEL_COLUMNS_PATH, encoder_path=ENCODER_PATH):
+    """Load the trained pollution model and the StationEncoder it was trained with
+
+    Models saved before the encoder existed only have a column list; their
+    encoder is rebuilt from it.
+    """
+    model = joblib.load(model_path)
+    if os.path.exists(encoder_path):
+        encoder = joblib.load(encoder_path)
+    else:
+        encoder = StationEncoder.from_columns(joblib.load(columns_path))
+
+    # Training and serving must agree on the feature layout
+    feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is None:
+        feature_names = getattr(_forests(model)[0], 'feature_names_in_', None)
+    if feature_names is not None and list(feature_names) != encoder.columns:
+        raise ValueError("station encoder does not match the features the model was trained on")
+    return model, encoder
+
+
+def calculate_tds(predictions):
+    """Derive TDS from predicted pollutants (NO3 + SO4 + CL + minerals)"""
+    predictions = np.asarray(predictions)
+    return predictions[..., 1] + predictions[..., 3] + predictions[..., 5] + TDS_BASE_MINERALS
+
+
+def _forests(model):
+    """Return the fitted forests behind the model, one per output for MultiOutputRegressor"""
+    forests = getattr(model, 'estimators_', None)
+    if forests is not None and len(forests) and hasattr(forests[0], 'estimators_'):
+        return list(forests)
+    if forests is not None:
+        return [model]
+    raise ValueError(f"{type(model).__name__} has no fitted trees to derive intervals from")
+
+
+def collect_tree_predictions(model, X):
+    """Stack every tree's output into one (n_trees, n_samples, 7) array, TDS included"""
+    # Trees are fitted on float32 inputs, so convert once and skip per-tree validation
+    if sparse.issparse(X):
+        X = sparse.csr_matrix(X, dtype=np.float32)
+        X.sort_indices()
+    else:
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    forests = _forests(model)
+    n_trees = min(len(forest.estimators_) for forest in forests)
+    tree_outputs = np.empty((n_trees, X.shape[0], len(FORECAST_PARAMETERS)))
+
+    if len(forests) == 1:
+        # A natively multi-output forest predicts all pollutants per tree
+        for t, tree in enumerate(forests[0].estimators_[:n_trees]):
+            tree_outputs[t, :, :len(POLLUTANTS)] = tree.predict(X, check_input=False).reshape(X.shape[0], -1)
+    else:
+        # MultiOutputRegressor keeps one forest per pollutant; tree t of every forest forms one ensemble member
+        for p, forest in enumerate(forests):
+            for t, tree in enumerate(forest.estimators_[:n_trees]):
+                tree_outputs[t, :, p] = tree.predict(X, check_input=False)
+
+    tree_outputs[..., -1] = calculate_tds(tree_outputs)
+    return tree_outputs
+
+
+def predict_pollutants(model, X):
+    """Point forecast of the six pollutants, equal to model.predict for dense or CSR inputs"""
+    return collect_tree_predictions(model, X)[..., :len(POLLUTANTS)].mean(axis=0)
+
+
+def predict_with_intervals(model, X, interval=0.9):
+    """Predict pollutants and TDS with quantile intervals across the forest's trees
+
+    Returns (point, lower, upper), each shaped (n_samples, 7) in FORECAST_PARAMETERS order.
+    The point prediction is the median over trees, so it always lies within its
+    interval; the mean (model.predict, predict_pollutants) can fall outside it.
+    """
+    tree_outputs = collect_tree_predictions(model, X)
+    tail = (1 - interval) / 2
+    lower, point, upper = np.quantile(tree_outputs, [tail, 0.5, 1 - tail], axis=0)
+    return point, lower, upper
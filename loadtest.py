@@ -0,0 +1,231 @@
+# Concurrent-session load testing for the dashboard code paths
+"""Ramp simulated dashboard sessions and report latency, throughput and memory.
+
+Streamlit serves every browser session from a thread of one server process,
+so sessions are simulated the same way: a thread pool runs scripted sessions
+in which each interaction is one script rerun. A rerun goes through the same
+`st.cache_*` functions in caches.py that app.py calls, including argument
+hashing and the DataFrame copy on every `cache_data` hit, and builds its
+charts with the view builders in views.py. Figures are serialized to JSON and
+tables to Arrow as a stand-in for Streamlit's own element serialization,
+which is not measured.
+Prediction clicks pick a random station, year and interval setting. Data
+Analysis interactions pick a random view and random widget values, including
+anomaly thresholds that miss the cache on first use.
+
+The caches are warmed first, as on an instance that passed its readiness check.
+
+    python loadtest.py --concurrency 1 2 4 8 16 --duration 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+
+import caches
+from anomalies import ANOMALY_PARAMETERS
+from assessment import assess_water_quality, classify_tds
+from climatology import CLIMATOLOGY_PARAMETERS
+from forecast import POLLUTANTS, calculate_tds, predict_pollutants, predict_with_intervals
+from stations import STATION_MAPPING, add_station_info
+from views import (
+    anomaly_history, city_comparison, correlation_heatmap, flagged_readings, pollutant_trends, prediction_figure,
+    seasonal_climatology, similar_stations, state_comparison, station_scatter
+)
+from warmup import warm_up
+
+ANALYSIS_TYPES = ["State-wise Comparison", "City-wise Comparison", "Pollutant Trends", "Station Comparison",
+                  "Measurement Anomalies", "Seasonal Climatology", "Correlation Heatmap"]
+# Widget values offered by app.py
+INTERVAL_LEVELS = [50, 80, 90, 95]
+ANOMALY_THRESHOLDS = [2.0 + 0.5 * step for step in range(9)]
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        pass
+    try:
+        # Peak RSS is the best portable fallback (KB on Linux, bytes on macOS)
+        import resource
+    except ImportError:
+        # Windows has neither; memory columns read NaN
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+class DashboardWorkload:
+    """The work one app.py rerun performs per interaction, through the shared caches and views"""
+
+    def __init__(self):
+        self.warmup_timings = warm_up()
+
+    def predict(self, rng):
+        """🔮 Prediction page: encode, predict, assess and chart one station/year"""
+        model, encoder = caches.get_forecast_model()
+        caches.get_measurements()
+        station_id = rng.choice(encoder.station_ids)
+        year = rng.randint(2000, 2030)
+        input_encoded = encoder.transform([year], [station_id])
+        interval_bounds = None
+        interval_level = rng.choice(INTERVAL_LEVELS)
+        if rng.random() < 0.5:
+            point, lower, upper = predict_with_intervals(model, input_encoded, interval_level / 100)
+            predicted = point[0, :len(POLLUTANTS)]
+            interval_bounds = (lower[0], upper[0])
+            tds_value = point[0, -1]
+        else:
+            predicted = predict_pollutants(model, input_encoded)[0]
+            tds_value = calculate_tds(predicted)
+        assess_water_quality(predicted, tds_value)
+        classify_tds(tds_value)
+        fig = prediction_figure(predicted, tds_value, STATION_MAPPING[station_id], year, interval_bounds, interval_level)
+        return fig.to_json()
+
+    def analyse(self, rng):
+        """📊 Data Analysis page: render a random view with random widget values"""
+        df = caches.get_measurements()
+        df_enhanced = caches.get_enhanced_measurements()
+        analysis_type = rng.choice(ANALYSIS_TYPES)
+        pollutant = rng.choice(POLLUTANTS)
+        states = sorted(df_enhanced['state'].unique())
+        station_ids = sorted(df_enhanced['id'].unique())
+
+        if analysis_type == "State-wise Comparison":
+            figures = [state_comparison(df_enhanced, pollutant)[1]]
+        elif analysis_type == "City-wise Comparison":
+            figures = [city_comparison(df_enhanced, pollutant, rng.choice(["All States"] + states))]
+        elif analysis_type == "Pollutant Trends":
+            geo_filter = rng.choice(["All Locations", "By State", "By City"])
+            selected_states = rng.sample(states, k=rng.randint(0, 2)) if geo_filter == "By State" else []
+            cities = sorted(df_enhanced['city'].unique())
+            selected_cities = rng.sample(cities, k=rng.randint(0, 2)) if geo_filter == "By City" else []
+            figures = [pollutant_trends(df_enhanced, pollutant, selected_states, selected_cities)]
+        elif analysis_type == "Station Comparison":
+            station_means = caches.get_station_means()
+            station_index = caches.build_station_index(df_enhanced)
+            reference_station = rng.choice(station_means['id'].tolist())
+            _, profile_fig = similar_stations(station_index, station_means, reference_station, rng.randint(1, len(station_index) - 1))
+            figures = [station_scatter(station_means, pollutant), profile_fig]
+        elif analysis_type == "Measurement Anomalies":
+            anomalies = add_station_info(caches.detect_anomalies(df, rng.choice(ANOMALY_THRESHOLDS)), STATION_MAPPING)
+            # st.dataframe ships tables to the browser as Arrow
+            pa.Table.from_pandas(flagged_readings(anomalies), preserve_index=False)
+            figures = [anomaly_history(df_enhanced, anomalies, rng.choice(station_ids), rng.choice(ANOMALY_PARAMETERS), STATION_MAPPING)]
+        elif analysis_type == "Seasonal Climatology":
+            climatology = caches.build_climatology(df)
+            parameter = rng.choice(CLIMATOLOGY_PARAMETERS)
+            station_id = rng.choice([None] + station_ids)
+            _, (latest_date, latest_value), fig = seasonal_climatology(climatology, parameter, station_id)
+            if latest_date is not None:
+                climatology.percentile_rank(parameter, latest_date.month, latest_value, [station_id])
+            figures = [fig]
+        else:
+            correlation_engine = caches.build_correlation_engine(df)
+            min_year, max_year = int(df_enhanced['year'].min()), int(df_enhanced['year'].max())
+            start = rng.randint(min_year, max_year)
+            year_range = (start, rng.randint(start, max_year))
+            figures = [correlation_heatmap(correlation_engine, rng.sample(states, k=rng.randint(0, 2)), year_range)[2]]
+        return [fig.to_json() for fig in figures]
+
+
+def run_step(workload, concurrency, duration, think_time=0.0, seed=0):
+    """Run `concurrency` sessions for `duration` seconds and collect per-action latencies"""
+    latencies = {'predict': [], 'analysis': []}
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def session(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            action = 'predict' if rng.random() < 0.5 else 'analysis'
+            start = time.perf_counter()
+            try:
+                workload.predict(rng) if action == 'predict' else workload.analyse(rng)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{action}: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[action].append(elapsed)
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(session, range(concurrency)))
+    wall = time.perf_counter() - started
+
+    all_latencies = latencies['predict'] + latencies['analysis']
+    result = {
+        'concurrency': concurrency,
+        'requests': len(all_latencies),
+        'errors': len(errors),
+        'throughput_rps': len(all_latencies) / wall,
+        'rss_mb': current_rss_mb(),
+        'rss_growth_mb': current_rss_mb() - rss_before,
+    }
+    for action, values in [('all', all_latencies)] + list(latencies.items()):
+        if values:
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+        else:
+            p50 = p95 = p99 = float('nan')
+        result[f'{action}_p50_ms'] = p50
+        result[f'{action}_p95_ms'] = p95
+        result[f'{action}_p99_ms'] = p99
+    if errors:
+        result['first_error'] = errors[0]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the dashboard's prediction and analysis paths")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Concurrent sessions per ramp step")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per ramp step")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a session's actions (s)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    rss_start = current_rss_mb()
+    print("⏳ Warming the dashboard caches...")
+    workload = DashboardWorkload()
+    # One untimed warm-up pass so lazy imports and first-call costs stay out of the numbers
+    rng = random.Random(0)
+    workload.predict(rng)
+    workload.analyse(rng)
+    print(f"✅ Warm in-process workload ready in {sum(workload.warmup_timings.values()):.1f}s ({current_rss_mb() - rss_start:.0f} MB)")
+
+    header = f"{'sessions':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'pred p95':>9} {'anl p95':>8} {'RSS MB':>8} {'ΔRSS':>6} {'errors':>6}"
+    print(header)
+    results = []
+    for step, concurrency in enumerate(args.concurrency):
+        r = run_step(workload, concurrency, args.duration, args.think_time, seed=step)
+        results.append(r)
+        print(f"{r['concurrency']:>8} {r['throughput_rps']:>8.1f} {r['all_p50_ms']:>8.1f} {r['all_p95_ms']:>8.1f} "
+              f"{r['all_p99_ms']:>8.1f} {r['predict_p95_ms']:>9.1f} {r['analysis_p95_ms']:>8.1f} "
+              f"{r['rss_mb']:>8.0f} {r['rss_growth_mb']:>+6.0f} {r['errors']:>6}")
+        if 'first_error' in r:
+            print(f"   ⚠️ {r['first_error']}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+# Bulk per-station water quality reports
+"""Render a water quality report for every monitoring station.
+
+Each report covers the station's measurement history, the median forecast
+across trees with per-tree intervals, TDS classification and the drinkability
+assessment shown on the Prediction page. Work is spread over a process pool. A manifest in the
+output directory records the forecast settings, the model and data files the
+reports were built from, and the stations finished so far; an interrupted run
+resumes where it stopped only when those settings and inputs still match.
+
+    python reports.py --out reports --state Karnataka --workers 4
+"""
+import argparse
+import html
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+from assessment import VERDICT_LABELS, assess_water_quality, classify_tds
+from forecast import (
+    ENCODER_PATH, FORECAST_PARAMETERS, MODEL_COLUMNS_PATH, MODEL_PATH, POLLUTANTS,
+    load_forecast_model, predict_with_intervals
+)
+from stations import DATA_PATH, MEASURED_PARAMETERS, STATION_MAPPING, load_measurements
+
+MANIFEST_NAME = "manifest.json"
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#17becf']
+
+# Loaded once per worker process (inherited from the parent when forking)
+_MODEL = None
+_ENCODER = None
+_DATA = None
+
+
+def _init_worker(model_path, columns_path, encoder_path, data_path):
+    """Load the model and measurements unless this process already holds them"""
+    global _MODEL, _ENCODER, _DATA
+    if _MODEL is None:
+        _MODEL, _ENCODER = load_forecast_model(model_path, columns_path, encoder_path)
+    if _DATA is None:
+        _DATA = load_measurements(data_path) if os.path.exists(data_path) else None
+
+
+def select_stations(station_mapping=STATION_MAPPING, state=None, city=None, station_ids=None):
+    """Return the station ids matching the optional state, city and id filters"""
+    selected = []
+    for sid, info in station_mapping.items():
+        if station_ids and sid not in station_ids:
+            continue
+        if state and info['state'] != state:
+            continue
+        if city and info['city'] != city:
+            continue
+        selected.append(sid)
+    return sorted(selected)
+
+
+def report_path(out_dir, station_id, suffix):
+    return os.path.join(out_dir, f"station_{station_id:03d}{suffix}")
+
+
+def _write_atomic(path, write):
+    """Write through a temporary file so a crash never leaves a partial output"""
+    tmp_path = path + ".tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_text_atomic(path, text):
+    """Atomically write a UTF-8 text file, closing it before it is moved into place"""
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    _write_atomic(path, write)
+
+
+def _file_fingerprint(path):
+    """Size and modification time of an input file (None when it does not exist)"""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def run_settings(years, interval, images, input_paths):
+    """Everything that determines a report's contents, as stored in the manifest"""
+    return {
+        'years': [int(year) for year in years],
+        'interval': float(interval),
+        'images': bool(images),
+        'inputs': {path: _file_fingerprint(path) for path in input_paths},
+    }
+
+
+def _read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(out_dir, settings, completed):
+    manifest = {'settings': settings, 'completed': sorted(completed)}
+    _write_text_atomic(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=2))
+
+
+def _has_reports(out_dir):
+    return any(name.startswith("station_") and name.endswith(".html") for name in os.listdir(out_dir))
+
+
+def station_forecast(station_id, years, interval=0.9):
+    """Forecast every parameter for the given years with intervals and assessments
+
+    Returns an empty frame for stations the model was not trained on.
+    """
+    if not _ENCODER.knows(station_id):
+        return pd.DataFrame(columns=['year'] + FORECAST_PARAMETERS)
+    input_encoded = _ENCODER.transform(years, [station_id] * len(years))
+    point, lower, upper = predict_with_intervals(_MODEL, input_encoded, interval)
+
+    rows = []
+    for i, year in enumerate(years):
+        row = {'year': year}
+        for j, parameter in enumerate(FORECAST_PARAMETERS):
+            row[parameter] = point[i, j]
+            row[f'{parameter}_lower'] = lower[i, j]
+            row[f'{parameter}_upper'] = upper[i, j]
+        assessment = assess_water_quality(point[i, :len(POLLUTANTS)], point[i, -1])
+        row['tds_class'] = classify_tds(point[i, -1])[1]
+        row['quality_score'] = assessment['quality_score']
+        row['quality_percentage'] = assessment['quality_percentage']
+        row['verdict'] = VERDICT_LABELS[assessment['verdict']]
+        row['issues'] = "; ".join(assessment['drinkability_issues'])
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def station_history(station_id):
+    """Yearly mean of every measured parameter at the station"""
+    if _DATA is None:
+        return pd.DataFrame(columns=['year', 'samples'] + MEASURED_PARAMETERS)
+    station_df = _DATA[_DATA['id'] == station_id]
+    history = station_df.groupby('year')[MEASURED_PARAMETERS].mean()
+    history.insert(0, 'samples', station_df.groupby('year').size())
+    return history.reset_index()
+
+
+def _history_figure(history, title):
+    fig = go.Figure()
+    for parameter, color in zip(POLLUTANTS, COLORS):
+        fig.add_trace(go.Scatter(x=history['year'], y=history[parameter], mode='lines+markers', name=parameter, line=dict(color=color)))
+    fig.update_layout(title=title, xaxis_title="Year", yaxis_title="Concentration (mg/L)", yaxis_type="log", template="plotly_white", height=450)
+    return fig
+
+
+def _forecast_figure(forecast, title):
+    fig = go.Figure()
+    for parameter, color in zip(FORECAST_PARAMETERS, COLORS):
+        fig.add_trace(go.Bar(
+            x=forecast['year'],
+            y=forecast[parameter],
+            name=parameter,
+            marker_color=color,
+            error_y=dict(
+                type='data',
+                symmetric=False,
+                array=forecast[f'{parameter}_upper'] - forecast[parameter],
+                arrayminus=forecast[parameter] - forecast[f'{parameter}_lower'],
+            ),
+        ))
+    fig.update_layout(title=title, xaxis_title="Year", yaxis_title="Concentration (mg/L)", yaxis_type="log", barmode='group', template="plotly_white", height=500)
+    return fig
+
+
+def _render_html(station_id, info, history, forecast, figures, interval):
+    place = html.escape(f"{info['location']}, {info['city']}, {info['state']}")
+    sections = [f"<h1>💧 Station {station_id} - {place}</h1>"]
+
+    sections.append("<h2>📈 Measurement History</h2>")
+    if history.empty:
+        sections.append("<p>No historical measurements are available for this station.</p>")
+    else:
+        sections.append(figures['history'].to_html(full_html=False, include_plotlyjs=False))
+        sections.append(history.round(3).to_html(index=False, border=0, classes="table"))
+
+    sections.append(f"<h2>🔮 Forecast ({int(interval * 100)}% intervals across trees)</h2>")
+    sections.append("<p>Forecasts are the median prediction across the forest's trees, at the centre of each interval.</p>")
+    if forecast.empty:
+        sections.append("<p>The model has no training data for this station, so no forecast or assessment is available.</p>")
+        return _page(station_id, sections)
+    sections.append(figures['forecast'].to_html(full_html=False, include_plotlyjs=False))
+
+    sections.append("<h2>🎯 Water Quality Assessment &amp; Drinkability</h2>")
+    summary = forecast[['year', 'TDS', 'tds_class', 'quality_score', 'quality_percentage', 'verdict', 'issues']]
+    summary = summary.rename(columns={
+        'year': 'Year', 'TDS': 'TDS (mg/L)', 'tds_class': 'TDS Classification', 'quality_score': 'Score (of 7)',
+        'quality_percentage': 'Score (%)', 'verdict': 'Drinkability', 'issues': 'Issues'
+    })
+    sections.append(summary.round(1).to_html(index=False, border=0, classes="table"))
+    return _page(station_id, sections)
+
+
+def _page(station_id, sections):
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Station {station_id} Water Quality Report</title>
+<script src="plotly.min.js"></script>
+<style>
+    body {{ font-family: sans-serif; margin: 2rem; }}
+    h1 {{ color: #1f77b4; }}
+    h2 {{ color: #2e86ab; }}
+    .table {{ border-collapse: collapse; margin: 1rem 0; }}
+    .table th, .table td {{ padding: 0.3rem 0.8rem; border-bottom: 1px solid #ddd; text-align: right; }}
+</style>
+</head>
+<body>
+{chr(10).join(sections)}
+<p style="color: grey;">For educational and research purposes. Consult environmental professionals for decision-making.</p>
+</body>
+</html>
+"""
+
+
+def build_station_report(station_id, out_dir, years, interval=0.9, images=False):
+    """Write the CSV, HTML and optional PNG outputs for one station"""
+    info = STATION_MAPPING[station_id]
+    history = station_history(station_id)
+    forecast = station_forecast(station_id, years, interval)
+
+    figures = {}
+    if not forecast.empty:
+        figures['forecast'] = _forecast_figure(forecast, f"Forecast - Station {station_id}, {info['city']}")
+    if not history.empty:
+        figures['history'] = _history_figure(history, f"Yearly Means - Station {station_id}, {info['city']}")
+
+    _write_atomic(report_path(out_dir, station_id, "_history.csv"), lambda p: history.to_csv(p, index=False))
+    _write_atomic(report_path(out_dir, station_id, "_forecast.csv"), lambda p: forecast.to_csv(p, index=False))
+    if images:
+        for name, fig in figures.items():
+            _write_atomic(report_path(out_dir, station_id, f"_{name}.png"), lambda p: fig.write_image(p, format="png"))
+
+    # The HTML report is written last and marks the station as complete
+    page = _render_html(station_id, info, history, forecast, figures, interval)
+    _write_text_atomic(report_path(out_dir, station_id, ".html"), page)
+    return station_id
+
+
+def _write_index(out_dir, station_ids, completed):
+    """Summarise every finished report of the current settings in index.html and summary.csv"""
+    frames = []
+    links = []
+    for sid in station_ids:
+        if sid not in completed or not os.path.exists(report_path(out_dir, sid, ".html")):
+            continue
+        info = STATION_MAPPING[sid]
+        forecast = pd.read_csv(report_path(out_dir, sid, "_forecast.csv"))
+        frames.append(forecast.assign(id=sid, state=info['state'], city=info['city'], location=info['location']))
+        links.append(f'<li><a href="station_{sid:03d}.html">Station {sid} - {html.escape(info["location"])}, '
+                     f'{html.escape(info["city"])}, {html.escape(info["state"])}</a></li>')
+    if frames:
+        summary = pd.concat(frames, ignore_index=True)
+        leading = ['id', 'state', 'city', 'location', 'year']
+        summary = summary[leading + [c for c in summary.columns if c not in leading]]
+        _write_atomic(os.path.join(out_dir, "summary.csv"), lambda p: summary.to_csv(p, index=False))
+    page = "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Water Quality Reports</title></head><body>\n" \
+           f"<h1>💧 Water Quality Reports</h1>\n<ul>\n{chr(10).join(links)}\n</ul>\n</body></html>\n"
+    _write_text_atomic(os.path.join(out_dir, "index.html"), page)
+
+
+def generate_reports(out_dir, station_ids, years, workers=None, interval=0.9, images=False, force=False,
+                     model_path=MODEL_PATH, columns_path=MODEL_COLUMNS_PATH, encoder_path=ENCODER_PATH,
+                     data_path=DATA_PATH):
+    """Build reports for station_ids in parallel, resuming a matching earlier run unless force is set
+
+    Raises ValueError when out_dir holds reports built with other settings or
+    inputs and force is not set.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    plotly_js = os.path.join(out_dir, "plotly.min.js")
+    if not os.path.exists(plotly_js):
+        _write_text_atomic(plotly_js, get_plotlyjs())
+
+    if images and importlib.util.find_spec("kaleido") is None:
+        print("⚠️ kaleido is not installed; skipping static chart images", file=sys.stderr)
+        images = False
+
+    settings = run_settings(years, interval, images, (model_path, columns_path, encoder_path, data_path))
+    manifest = _read_manifest(out_dir)
+    if manifest is not None and manifest.get('settings') == settings:
+        completed = set(manifest.get('completed', []))
+    elif force or (manifest is None and not _has_reports(out_dir)):
+        # Reports from other settings stay on disk but are no longer listed or summarised
+        completed = set()
+    elif manifest is None:
+        raise ValueError(f"{out_dir} holds reports without a run manifest, so their settings are unknown; "
+                         "rerun with --force to rebuild them or choose another --out")
+    else:
+        previous = manifest.get('settings') or {}
+        changed = [key for key in settings if previous.get(key) != settings[key]]
+        raise ValueError(f"{out_dir} holds reports built with different {', '.join(changed)}; "
+                         "rerun with --force to rebuild them or choose another --out")
+
+    pending = [sid for sid in station_ids
+               if force or sid not in completed or not os.path.exists(report_path(out_dir, sid, ".html"))]
+    completed -= set(pending)
+    _write_manifest(out_dir, settings, completed)
+    print(f"📄 {len(station_ids) - len(pending)} of {len(station_ids)} reports already done, {len(pending)} to build")
+
+    if pending:
+        # Load once in the parent so forked workers share the model and data pages
+        _init_worker(model_path, columns_path, encoder_path, data_path)
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(model_path, columns_path, encoder_path, data_path)) as executor:
+            futures = {executor.submit(build_station_report, sid, out_dir, years, interval, images): sid for sid in pending}
+            for done, future in enumerate(as_completed(futures), start=1):
+                sid = futures[future]
+                try:
+                    future.result()
+                    completed.add(sid)
+                    _write_manifest(out_dir, settings, completed)
+                    print(f"✅ [{done}/{len(pending)}] Station {sid}")
+                except Exception as e:
+                    print(f"❌ [{done}/{len(pending)}] Station {sid}: {e}", file=sys.stderr)
+
+    _write_index(out_dir, station_ids, completed)
+    return [sid for sid in station_ids if sid in completed]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate per-station water quality reports")
+    parser.add_argument("--out", default="reports", help="Output directory")
+    parser.add_argument("--state", help="Only stations in this state")
+    parser.add_argument("--city", help="Only stations in this city")
+    parser.add_argument("--stations", type=int, nargs="+", help="Only these station ids")
+    parser.add_argument("--years", type=int, nargs="+", default=list(range(2022, 2027)), help="Forecast years")
+    parser.add_argument("--interval", type=float, default=0.9, help="Forecast interval coverage (0-1)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--images", action="store_true", help="Also export PNG charts (requires kaleido)")
+    parser.add_argument("--force", action="store_true", help="Rebuild reports that already exist, even if built with other settings")
+    args = parser.parse_args(argv)
+
+    station_ids = select_stations(state=args.state, city=args.city, station_ids=args.stations)
+    if not station_ids:
+        parser.error("no stations match the given filters")
+
+    try:
+        built = generate_reports(args.out, station_ids, args.years, workers=args.workers, interval=args.interval,
+                                 images=args.images, force=args.force)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"🎉 {len(built)} of {len(station_ids)} reports available in {args.out}")
+    return 0 if len(built) == len(station_ids) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# Station similarity search over pollutant profiles
+import numpy as np
+import pandas as pd
+
+from stations import MEASURED_PARAMETERS
+
+STATION_KEYS = ['id', 'state', 'city', 'location']
+
+
+def station_profiles(df_enhanced, parameters=MEASURED_PARAMETERS):
+    """Summarise each station by the mean, percentiles and yearly trend of every parameter"""
+    grouped = df_enhanced.groupby(STATION_KEYS)
+    means = grouped[parameters].mean().add_suffix('_mean')
+    quantiles = grouped[parameters].quantile([0.1, 0.5, 0.9]).unstack()
+    quantiles.columns = [f"{param}_p{int(q * 100)}" for param, q in quantiles.columns]
+
+    # Least-squares slope per station from grouped sums: cov(year, x) / var(year)
+    trends = {}
+    for param in parameters:
+        valid = df_enhanced[STATION_KEYS + ['year', param]].dropna(subset=[param])
+        year = valid['year'].astype(float)
+        valid = valid.assign(y=year, yy=year * year, xy=year * valid[param])
+        sums = valid.groupby(STATION_KEYS)[['y', 'yy', param, 'xy']].mean()
+        var = sums['yy'] - sums['y'] ** 2
+        trends[f"{param}_trend"] = ((sums['xy'] - sums['y'] * sums[param]) / var).where(var > 0)
+
+    return pd.concat([means, quantiles, pd.DataFrame(trends)], axis=1)
+
+
+class StationIndex:
+    """Prebuilt k-nearest-neighbour index over normalized station profiles
+
+    Features are standardized across stations and every profile is scaled to
+    unit length, so cosine similarity reduces to a single matrix-vector product
+    followed by a partial sort. Thousands of stations stay well under a millisecond.
+    """
+
+    def __init__(self, profiles):
+        features = profiles.to_numpy(dtype=float)
+        centre = np.nanmean(features, axis=0)
+        scale = np.nanstd(features, axis=0)
+        scale[~(scale > 0)] = 1.0
+
+        # Missing statistics sit at the network average and so carry no signal
+        vectors = np.nan_to_num((features - centre) / scale)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        self.vectors = np.ascontiguousarray(vectors / norms, dtype=np.float32)
+        self.stations = profiles.index.to_frame(index=False)
+        self._row = {sid: row for row, sid in enumerate(self.stations['id'])}
+
+    def __len__(self):
+        return len(self._row)
+
+    def query(self, station_id, k=5):
+        """Return the k stations whose profiles are most similar to station_id"""
+        row = self._row[station_id]
+        similarity = self.vectors @ self.vectors[row]
+        similarity[row] = -np.inf
+
+        k = min(k, len(self) - 1)
+        if k <= 0:
+            return self.stations.iloc[:0].assign(similarity=[])
+        nearest = np.argpartition(-similarity, k - 1)[:k]
+        nearest = nearest[np.argsort(-similarity[nearest])]
+        return self.stations.iloc[nearest].assign(similarity=similarity[nearest]).reset_index(drop=True)
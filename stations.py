@@ -0,0 +1,238 @@
+# Monitoring station metadata and measurement loading shared across tools
+import pandas as pd
+
+DATA_PATH = "PB_All_2000_2021.csv"
+
+MEASURED_PARAMETERS = ['NH4', 'BSK5', 'Suspended', 'O2', 'NO3', 'NO2', 'SO4', 'PO4', 'CL']
+
+# Mapping of station IDs to states and cities
+STATION_MAPPING = {
+    # Maharashtra - Mumbai & Pune
+    1: {"state": "Maharashtra", "city": "Mumbai", "location": "Powai Lake"},
+    2: {"state": "Maharashtra", "city": "Mumbai", "location": "Mithi River"},
+    3: {"state": "Maharashtra", "city": "Mumbai", "location": "Mahim Creek"},
+    4: {"state": "Maharashtra", "city": "Mumbai", "location": "Thane Creek"},
+    5: {"state": "Maharashtra", "city": "Pune", "location": "Mutha River"},
+    6: {"state": "Maharashtra", "city": "Pune", "location": "Mula River"},
+    7: {"state": "Maharashtra", "city": "Nagpur", "location": "Nag River"},
+    8: {"state": "Maharashtra", "city": "Nashik", "location": "Godavari River"},
+    
+    # Tamil Nadu - Chennai & other cities
+    9: {"state": "Tamil Nadu", "city": "Chennai", "location": "Cooum River"},
+    10: {"state": "Tamil Nadu", "city": "Chennai", "location": "Adyar River"},
+    11: {"state": "Tamil Nadu", "city": "Chennai", "location": "Buckingham Canal"},
+    12: {"state": "Tamil Nadu", "city": "Chennai", "location": "Kosasthalaiyar River"},
+    13: {"state": "Tamil Nadu", "city": "Coimbatore", "location": "Noyyal River"},
+    14: {"state": "Tamil Nadu", "city": "Madurai", "location": "Vaigai River"},
+    15: {"state": "Tamil Nadu", "city": "Tiruchirappalli", "location": "Kaveri River"},
+    16: {"state": "Tamil Nadu", "city": "Salem", "location": "Thirumanimutharu River"},
+    
+    # Karnataka - Bangalore & other cities
+    17: {"state": "Karnataka", "city": "Bangalore", "location": "Vrishabhavathi River"},
+    18: {"state": "Karnataka", "city": "Bangalore", "location": "Hebbal Lake"},
+    19: {"state": "Karnataka", "city": "Bangalore", "location": "Bellandur Lake"},
+    20: {"state": "Karnataka", "city": "Mysore", "location": "Kaveri River"},
+    21: {"state": "Karnataka", "city": "Hubli", "location": "Dharwad River"},
+    22: {"state": "Karnataka", "city": "Mangalore", "location": "Netravati River"},
+    
+    # Delhi NCR
+    23: {"state": "Delhi", "city": "New Delhi", "location": "Yamuna River"},
+    24: {"state": "Delhi", "city": "Delhi", "location": "Najafgarh Drain"},
+    25: {"state": "Delhi", "city": "Delhi", "location": "Hindon River"},
+    26: {"state": "Haryana", "city": "Gurgaon", "location": "Najafgarh Drain"},
+    27: {"state": "Haryana", "city": "Faridabad", "location": "Yamuna River"},
+    28: {"state": "Uttar Pradesh", "city": "Noida", "location": "Hindon River"},
+    29: {"state": "Uttar Pradesh", "city": "Ghaziabad", "location": "Hindon River"},
+    
+    # Andhra Pradesh & Telangana
+    30: {"state": "Telangana", "city": "Hyderabad", "location": "Hussain Sagar Lake"},
+    31: {"state": "Telangana", "city": "Hyderabad", "location": "Musi River"},
+    32: {"state": "Andhra Pradesh", "city": "Visakhapatnam", "location": "Gosthani River"},
+    33: {"state": "Andhra Pradesh", "city": "Vijayawada", "location": "Krishna River"},
+    34: {"state": "Andhra Pradesh", "city": "Tirupati", "location": "Swarnamukhi River"},
+    
+    # Gujarat
+    35: {"state": "Gujarat", "city": "Ahmedabad", "location": "Sabarmati River"},
+    36: {"state": "Gujarat", "city": "Surat", "location": "Tapi River"},
+    37: {"state": "Gujarat", "city": "Vadodara", "location": "Vishwamitri River"},
+    38: {"state": "Gujarat", "city": "Rajkot", "location": "Aji River"},
+    
+    # West Bengal
+    39: {"state": "West Bengal", "city": "Kolkata", "location": "Hooghly River"},
+    40: {"state": "West Bengal", "city": "Kolkata", "location": "Salt Lake"},
+    41: {"state": "West Bengal", "city": "Durgapur", "location": "Damodar River"},
+    42: {"state": "West Bengal", "city": "Siliguri", "location": "Mahananda River"},
+    
+    # Kerala
+    43: {"state": "Kerala", "city": "Kochi", "location": "Periyar River"},
+    44: {"state": "Kerala", "city": "Trivandrum", "location": "Karamana River"},
+    45: {"state": "Kerala", "city": "Kozhikode", "location": "Kallai River"},
+    46: {"state": "Kerala", "city": "Thrissur", "location": "Bharathapuzha River"},
+    
+    # Rajasthan
+    47: {"state": "Rajasthan", "city": "Jaipur", "location": "Mansagar Lake"},
+    48: {"state": "Rajasthan", "city": "Udaipur", "location": "Lake Pichola"},
+    49: {"state": "Rajasthan", "city": "Jodhpur", "location": "Kaylana Lake"},
+    50: {"state": "Rajasthan", "city": "Kota", "location": "Chambal River"},
+    
+    # Punjab
+    51: {"state": "Punjab", "city": "Ludhiana", "location": "Sutlej River"},
+    52: {"state": "Punjab", "city": "Amritsar", "location": "Beas River"},
+    53: {"state": "Punjab", "city": "Jalandhar", "location": "Sutlej River"},
+    54: {"state": "Punjab", "city": "Patiala", "location": "Ghaggar River"},
+    
+    # Uttar Pradesh
+    55: {"state": "Uttar Pradesh", "city": "Lucknow", "location": "Gomti River"},
+    56: {"state": "Uttar Pradesh", "city": "Kanpur", "location": "Ganga River"},
+    57: {"state": "Uttar Pradesh", "city": "Agra", "location": "Yamuna River"},
+    58: {"state": "Uttar Pradesh", "city": "Varanasi", "location": "Ganga River"},
+    59: {"state": "Uttar Pradesh", "city": "Meerut", "location": "Ganga Canal"},
+    60: {"state": "Uttar Pradesh", "city": "Allahabad", "location": "Sangam Point"},
+    
+    # Madhya Pradesh
+    61: {"state": "Madhya Pradesh", "city": "Bhopal", "location": "Upper Lake"},
+    62: {"state": "Madhya Pradesh", "city": "Indore", "location": "Khan River"},
+    63: {"state": "Madhya Pradesh", "city": "Jabalpur", "location": "Narmada River"},
+    64: {"state": "Madhya Pradesh", "city": "Gwalior", "location": "Chambal River"},
+    
+    # Bihar & Jharkhand
+    65: {"state": "Bihar", "city": "Patna", "location": "Ganga River"},
+    66: {"state": "Bihar", "city": "Gaya", "location": "Falgu River"},
+    67: {"state": "Jharkhand", "city": "Ranchi", "location": "Subarnarekha River"},
+    68: {"state": "Jharkhand", "city": "Jamshedpur", "location": "Subarnarekha River"},
+    
+    # Odisha
+    69: {"state": "Odisha", "city": "Bhubaneswar", "location": "Kuakhai River"},
+    70: {"state": "Odisha", "city": "Cuttack", "location": "Mahanadi River"},
+    
+    # Assam & Northeast
+    71: {"state": "Assam", "city": "Guwahati", "location": "Brahmaputra River"},
+    72: {"state": "Assam", "city": "Dibrugarh", "location": "Brahmaputra River"},
+    
+    # Himachal Pradesh & Uttarakhand
+    73: {"state": "Himachal Pradesh", "city": "Shimla", "location": "Sutlej River"},
+    74: {"state": "Himachal Pradesh", "city": "Manali", "location": "Beas River"},
+    75: {"state": "Himachal Pradesh", "city": "Dharamshala", "location": "Banganga River"},
+    76: {"state": "Uttarakhand", "city": "Dehradun", "location": "Rispana River"},
+    77: {"state": "Uttarakhand", "city": "Haridwar", "location": "Ganga River"},
+    78: {"state": "Uttarakhand", "city": "Rishikesh", "location": "Ganga River"},
+    79: {"state": "Uttarakhand", "city": "Nainital", "location": "Naini Lake"},
+    
+    # Jammu & Kashmir
+    80: {"state": "Jammu & Kashmir", "city": "Srinagar", "location": "Dal Lake"},
+    81: {"state": "Jammu & Kashmir", "city": "Srinagar", "location": "Jhelum River"},
+    82: {"state": "Jammu & Kashmir", "city": "Jammu", "location": "Tawi River"},
+    83: {"state": "Jammu & Kashmir", "city": "Leh", "location": "Indus River"},
+    
+    # Chhattisgarh
+    84: {"state": "Chhattisgarh", "city": "Raipur", "location": "Mahanadi River"},
+    85: {"state": "Chhattisgarh", "city": "Bilaspur", "location": "Arpa River"},
+    86: {"state": "Chhattisgarh", "city": "Durg", "location": "Shivnath River"},
+    
+    # Goa
+    87: {"state": "Goa", "city": "Panaji", "location": "Mandovi River"},
+    88: {"state": "Goa", "city": "Margao", "location": "Sal River"},
+    89: {"state": "Goa", "city": "Vasco da Gama", "location": "Zuari River"},
+    
+    # Tripura & Northeast States
+    90: {"state": "Tripura", "city": "Agartala", "location": "Haora River"},
+    91: {"state": "Manipur", "city": "Imphal", "location": "Imphal River"},
+    92: {"state": "Meghalaya", "city": "Shillong", "location": "Umiam Lake"},
+    93: {"state": "Mizoram", "city": "Aizawl", "location": "Tlawng River"},
+    94: {"state": "Nagaland", "city": "Kohima", "location": "Doyang River"},
+    95: {"state": "Arunachal Pradesh", "city": "Itanagar", "location": "Pare River"},
+    96: {"state": "Sikkim", "city": "Gangtok", "location": "Teesta River"},
+    
+    # Additional Maharashtra stations
+    97: {"state": "Maharashtra", "city": "Aurangabad", "location": "Kham River"},
+    98: {"state": "Maharashtra", "city": "Solapur", "location": "Sina River"},
+    99: {"state": "Maharashtra", "city": "Kolhapur", "location": "Panchganga River"},
+    100: {"state": "Maharashtra", "city": "Sangli", "location": "Krishna River"},
+    
+    # Additional Tamil Nadu stations
+    101: {"state": "Tamil Nadu", "city": "Vellore", "location": "Palar River"},
+    102: {"state": "Tamil Nadu", "city": "Tirunelveli", "location": "Thamirabarani River"},
+    103: {"state": "Tamil Nadu", "city": "Erode", "location": "Kaveri River"},
+    104: {"state": "Tamil Nadu", "city": "Thanjavur", "location": "Kaveri River"},
+    105: {"state": "Tamil Nadu", "city": "Kanchipuram", "location": "Vegavathi River"},
+    
+    # Additional Karnataka stations
+    106: {"state": "Karnataka", "city": "Belgaum", "location": "Ghataprabha River"},
+    107: {"state": "Karnataka", "city": "Gulbarga", "location": "Bhima River"},
+    108: {"state": "Karnataka", "city": "Davangere", "location": "Tungabhadra River"},
+    109: {"state": "Karnataka", "city": "Shimoga", "location": "Tunga River"},
+    110: {"state": "Karnataka", "city": "Hassan", "location": "Hemavati River"},
+    
+    # Additional Andhra Pradesh stations
+    111: {"state": "Andhra Pradesh", "city": "Guntur", "location": "Krishna River"},
+    112: {"state": "Andhra Pradesh", "city": "Nellore", "location": "Pennar River"},
+    113: {"state": "Andhra Pradesh", "city": "Kakinada", "location": "Godavari River"},
+    114: {"state": "Andhra Pradesh", "city": "Anantapur", "location": "Pennar River"},
+    115: {"state": "Andhra Pradesh", "city": "Kurnool", "location": "Tungabhadra River"},
+    
+    # Additional Gujarat stations
+    116: {"state": "Gujarat", "city": "Gandhinagar", "location": "Sabarmati River"},
+    117: {"state": "Gujarat", "city": "Bhavnagar", "location": "Gaurishankar Lake"},
+    118: {"state": "Gujarat", "city": "Jamnagar", "location": "Lakhota Lake"},
+    119: {"state": "Gujarat", "city": "Junagadh", "location": "Kalwa River"},
+    120: {"state": "Gujarat", "city": "Anand", "location": "Watrak River"},
+    
+    # Additional West Bengal stations
+    121: {"state": "West Bengal", "city": "Howrah", "location": "Hooghly River"},
+    122: {"state": "West Bengal", "city": "Malda", "location": "Mahananda River"},
+    123: {"state": "West Bengal", "city": "Asansol", "location": "Damodar River"},
+    124: {"state": "West Bengal", "city": "Darjeeling", "location": "Teesta River"},
+    
+    # Additional Kerala stations
+    125: {"state": "Kerala", "city": "Kannur", "location": "Valapattanam River"},
+    126: {"state": "Kerala", "city": "Kollam", "location": "Ashtamudi Lake"},
+    127: {"state": "Kerala", "city": "Palakkad", "location": "Bharathapuzha River"},
+    128: {"state": "Kerala", "city": "Alappuzha", "location": "Vembanad Lake"},
+    
+    # Additional Rajasthan stations
+    129: {"state": "Rajasthan", "city": "Bikaner", "location": "Gajner Lake"},
+    130: {"state": "Rajasthan", "city": "Ajmer", "location": "Ana Sagar Lake"},
+    131: {"state": "Rajasthan", "city": "Alwar", "location": "Siliserh Lake"},
+    132: {"state": "Rajasthan", "city": "Bharatpur", "location": "Ajan Bund"},
+    
+    # Additional Punjab & Haryana stations
+    133: {"state": "Punjab", "city": "Bathinda", "location": "Ghaggar River"},
+    134: {"state": "Punjab", "city": "Mohali", "location": "Ghaggar River"},
+    135: {"state": "Haryana", "city": "Panipat", "location": "Yamuna River"},
+    136: {"state": "Haryana", "city": "Karnal", "location": "Yamuna River"},
+    137: {"state": "Haryana", "city": "Hisar", "location": "Ghaggar River"},
+    138: {"state": "Haryana", "city": "Rohtak", "location": "Drainage Canal"},
+    
+    # Additional UP stations
+    139: {"state": "Uttar Pradesh", "city": "Bareilly", "location": "Ramganga River"},
+    140: {"state": "Uttar Pradesh", "city": "Moradabad", "location": "Ramganga River"},
+    141: {"state": "Uttar Pradesh", "city": "Saharanpur", "location": "Yamuna River"},
+    142: {"state": "Uttar Pradesh", "city": "Gorakhpur", "location": "Rapti River"},
+    143: {"state": "Uttar Pradesh", "city": "Mathura", "location": "Yamuna River"},
+    144: {"state": "Uttar Pradesh", "city": "Firozabad", "location": "Yamuna River"},
+    145: {"state": "Uttar Pradesh", "city": "Aligarh", "location": "Kali River"},
+    
+    # Additional MP stations
+    146: {"state": "Madhya Pradesh", "city": "Ujjain", "location": "Shipra River"},
+    147: {"state": "Madhya Pradesh", "city": "Sagar", "location": "Bina River"},
+    148: {"state": "Madhya Pradesh", "city": "Rewa", "location": "Tons River"},
+    149: {"state": "Madhya Pradesh", "city": "Satna", "location": "Tons River"},
+    150: {"state": "Madhya Pradesh", "city": "Dewas", "location": "Kshipra River"}
+}
+
+
+def load_measurements(path=DATA_PATH):
+    """Read the raw measurement table and derive the year of each sample"""
+    df = pd.read_csv(path, sep=";")
+    df['date'] = pd.to_datetime(df['date'], format='%d.%m.%Y')
+    df['year'] = df['date'].dt.year
+    return df
+
+
+def add_station_info(df, station_mapping=STATION_MAPPING):
+    """Attach state, city and location columns to a table keyed by station id"""
+    df_enhanced = df.copy()
+    df_enhanced['state'] = df_enhanced['id'].map(lambda x: station_mapping[x]['state'])
+    df_enhanced['city'] = df_enhanced['id'].map(lambda x: station_mapping[x]['city'])
+    df_enhanced['location'] = df_enhanced['id'].map(lambda x: station_mapping[x]['location'])
+    return df_enhanced
@@ -0,0 +1,263 @@
+# Data and figure builders for the dashboard views, shared by app.py and the load test
+import plotly.express as px
+import plotly.graph_objects as go
+import numpy as np
+
+from climatology import MONTH_NAMES
+from forecast import FORECAST_PARAMETERS, POLLUTANTS
+
+PARAMETER_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#17becf']
+
+
+def prediction_figure(predicted_pollutants, tds_value, location_info, year, interval_bounds=None, interval_level=90):
+    """Bar chart of the predicted pollutants and TDS, with tree-quantile error bars when given"""
+    extended_values = list(predicted_pollutants) + [tds_value]
+
+    # Asymmetric error bars from the tree quantiles around the median forecast
+    error_y = None
+    if interval_bounds is not None:
+        error_y = dict(
+            type='data',
+            symmetric=False,
+            array=interval_bounds[1] - extended_values,
+            arrayminus=extended_values - interval_bounds[0],
+            color='grey'
+        )
+
+    fig = go.Figure(data=[
+        go.Bar(
+            x=FORECAST_PARAMETERS,
+            y=extended_values,
+            marker_color=PARAMETER_COLORS,
+            text=[f'{val:.2f}' for val in extended_values],
+            textposition='auto',
+            error_y=error_y,
+        )
+    ])
+
+    fig.update_layout(
+        title=f"AI Model Predictions with TDS Analysis - {location_info['city']}, {location_info['state']} ({year})",
+        xaxis_title="Water Quality Parameters",
+        yaxis_title="Concentration (mg/L)",
+        template="plotly_white",
+        height=500,
+        annotations=[
+            dict(
+                text="Predictions from your trained ML model" + (f" (median tree) with {interval_level}% intervals across trees" if interval_bounds is not None else ""),
+                showarrow=False,
+                xref="paper", yref="paper",
+                x=0.5, y=1.1, xanchor='center', yanchor='bottom',
+                font=dict(size=12, color="grey")
+            )
+        ]
+    )
+    return fig
+
+
+def state_comparison(df_enhanced, pollutant):
+    """State averages of a pollutant, highest first, and their bar chart"""
+    state_data = df_enhanced.groupby('state')[pollutant].mean().reset_index()
+    state_data = state_data.sort_values(pollutant, ascending=False)
+
+    fig = px.bar(
+        state_data,
+        x='state',
+        y=pollutant,
+        title=f'Average {pollutant} Levels by State',
+        labels={'state': 'State', pollutant: f'{pollutant} (mg/L)'},
+        color=pollutant,
+        color_continuous_scale='blues'
+    )
+    fig.update_layout(template="plotly_white", height=500)
+    fig.update_xaxes(tickangle=45)
+    return state_data, fig
+
+
+def city_comparison(df_enhanced, pollutant, state="All States"):
+    """Bar chart of city averages, optionally within one state"""
+    filtered_df = df_enhanced if state == "All States" else df_enhanced[df_enhanced['state'] == state]
+
+    # Calculate city-wise averages
+    city_data = filtered_df.groupby(['city', 'state'])[pollutant].mean().reset_index()
+    city_data = city_data.sort_values(pollutant, ascending=False)
+
+    fig = px.bar(
+        city_data,
+        x='city',
+        y=pollutant,
+        color='state',
+        title=f'Average {pollutant} Levels by City',
+        labels={'city': 'City', pollutant: f'{pollutant} (mg/L)'}
+    )
+    fig.update_layout(template="plotly_white", height=500)
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+def pollutant_trends(df_enhanced, pollutant, states=None, cities=None):
+    """Line chart of yearly means, optionally restricted to some states or cities"""
+    plot_df = df_enhanced
+    if states:
+        plot_df = plot_df[plot_df['state'].isin(states)]
+    if cities:
+        plot_df = plot_df[plot_df['city'].isin(cities)]
+
+    # Group by year and calculate mean
+    yearly_data = plot_df.groupby('year')[pollutant].mean().reset_index()
+
+    fig = px.line(
+        yearly_data,
+        x='year',
+        y=pollutant,
+        title=f'{pollutant} Trends Over Time',
+        labels={'year': 'Year', pollutant: f'{pollutant} (mg/L)'}
+    )
+    fig.update_layout(template="plotly_white", height=400)
+    return fig
+
+
+def station_scatter(station_means, pollutant):
+    """Scatter of every station's mean level of a pollutant"""
+    fig = px.scatter(
+        station_means,
+        x='id',
+        y=pollutant,
+        color='state',
+        size=pollutant,
+        hover_data=['city', 'location'],
+        title=f'Station-wise Average {pollutant} by Station',
+        labels={'id': 'Station ID', pollutant: f'{pollutant} (mg/L)'}
+    )
+    fig.update_layout(template="plotly_white", height=500)
+    return fig
+
+
+def similar_stations(station_index, station_means, reference_station, k):
+    """Nearest stations by pollutant profile and a grouped bar chart comparing their means"""
+    similar = station_index.query(reference_station, k=k)
+
+    profile_ids = [reference_station] + similar['id'].tolist()
+    profile_df = station_means.set_index('id').loc[profile_ids, POLLUTANTS].reset_index()
+    profile_df = profile_df.melt(id_vars='id', var_name='Pollutant', value_name='Mean (mg/L)')
+    profile_df['Station'] = profile_df['id'].map(lambda sid: f"Station {sid}")
+    fig = px.bar(
+        profile_df,
+        x='Pollutant',
+        y='Mean (mg/L)',
+        color='Station',
+        barmode='group',
+        log_y=True,
+        title=f'Pollutant Profile of Station {reference_station} vs Most Similar Stations'
+    )
+    fig.update_layout(template="plotly_white", height=450)
+    return similar, fig
+
+
+def anomaly_history(df_enhanced, anomalies, station_id, parameter, station_mapping):
+    """Station history of a parameter with its flagged readings highlighted"""
+    history = df_enhanced[df_enhanced['id'] == station_id].sort_values('date')
+    flagged = anomalies[(anomalies['id'] == station_id) & (anomalies['parameter'] == parameter)]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=history['date'],
+        y=history[parameter],
+        mode='lines+markers',
+        name='Measurements',
+        line=dict(color='#1f77b4')
+    ))
+    fig.add_trace(go.Scatter(
+        x=flagged['date'],
+        y=flagged['value'],
+        mode='markers',
+        name='Anomaly',
+        marker=dict(color='#d62728', size=12, symbol='x'),
+        customdata=flagged[['expected', 'z_score']],
+        hovertemplate='%{y:.3f} mg/L<br>Expected: %{customdata[0]:.3f}<br>z: %{customdata[1]:.1f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"{parameter} at Station {station_id} - {station_mapping[station_id]['location']}",
+        xaxis_title="Date",
+        yaxis_title=f"{parameter} (mg/L)",
+        template="plotly_white",
+        height=450
+    )
+    return fig
+
+
+def flagged_readings(anomalies):
+    """Flagged readings table, newest first"""
+    return anomalies.sort_values('date', ascending=False)[
+        ['date', 'id', 'state', 'city', 'location', 'parameter', 'value', 'expected', 'z_score']
+    ]
+
+
+def seasonal_climatology(climatology, parameter, station_id=None):
+    """Monthly summary, latest reading (None, NaN for all stations) and the climatology chart"""
+    scope = None if station_id is None else [station_id]
+    monthly = climatology.monthly_summary(parameter, scope)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=monthly['month_name'], y=monthly['p90'],
+        mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=monthly['month_name'], y=monthly['p10'],
+        mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(31, 119, 180, 0.2)',
+        name='10th-90th percentile'
+    ))
+    fig.add_trace(go.Scatter(
+        x=monthly['month_name'], y=monthly['p50'],
+        mode='lines+markers', name='Median', line=dict(color='#1f77b4')
+    ))
+    fig.add_trace(go.Scatter(
+        x=monthly['month_name'], y=monthly['mean'],
+        mode='markers', name='Mean', marker=dict(color='#ff7f0e', size=9, symbol='diamond'),
+        customdata=monthly['count'], hovertemplate='%{y:.3f} mg/L<br>Samples: %{customdata}<extra></extra>'
+    ))
+
+    # Current vs normal for a single station, from the stored latest reading
+    latest_date, latest_value = None, np.nan
+    if station_id is not None:
+        latest_date, latest_value = climatology.latest(station_id, parameter)
+        if latest_date is not None:
+            fig.add_trace(go.Scatter(
+                x=[MONTH_NAMES[latest_date.month - 1]], y=[latest_value],
+                mode='markers', name=f"Latest ({latest_date:%d.%m.%Y})",
+                marker=dict(color='#d62728', size=14, symbol='star')
+            ))
+
+    fig.update_layout(
+        title=f"Monthly {parameter} Climatology - {'All Stations' if station_id is None else f'Station {station_id}'}",
+        xaxis_title="Month",
+        yaxis_title=f"{parameter} (mg/L)",
+        template="plotly_white",
+        height=450
+    )
+    return monthly, (latest_date, latest_value), fig
+
+
+def correlation_heatmap(correlation_engine, states, year_range):
+    """Correlation matrix, pairwise sample counts and heatmap for a state and year filter"""
+    filters = dict(states=states, years=range(year_range[0], year_range[1] + 1))
+    corr_matrix = correlation_engine.correlation(**filters)
+    sample_counts = correlation_engine.sample_counts(**filters)
+
+    fig = go.Figure(data=go.Heatmap(
+        z=corr_matrix.values,
+        x=corr_matrix.columns,
+        y=corr_matrix.index,
+        colorscale='RdYlBu_r',
+        zmin=-1, zmax=1,
+        text=corr_matrix.round(2).values,
+        texttemplate="%{text}",
+        customdata=sample_counts.values,
+        hovertemplate='%{y} vs %{x}<br>r = %{z:.2f}<br>Samples: %{customdata}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Pollutant Correlation Matrix ({year_range[0]}-{year_range[1]})",
+        template="plotly_white",
+        height=600
+    )
+    return corr_matrix, sample_counts, fig
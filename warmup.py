@@ -0,0 +1,233 @@
+# Cache warm-up scheduler and readiness check
+"""Prebuild every cached resource before the dashboard takes traffic.
+
+The warm-up loads and smoke-tests the model, then materializes the data
+caches and aggregates that app.py would otherwise build lazily for its first
+users. It runs on startup and again every interval; when the model or data
+files change on disk the caches are cleared and rebuilt.
+
+Launch the dashboard through `serve` so the warm-up starts with the process
+rather than with the first session. With --ready-port, readiness is served
+over HTTP so a load balancer only routes to warm instances:
+
+    GET /ready   200 once warm, 503 while warming or after a failed run
+    GET /live    200 while the process is up
+
+    python warmup.py --once                    # warm and smoke-test, then exit
+    python warmup.py serve --ready-port 8599 -- --server.port 8501 --server.headless true
+
+Under a plain `streamlit run app.py` the warm-up only starts when the first
+session runs the script, so no readiness check is served in that mode.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import caches
+from forecast import ENCODER_PATH, FORECAST_PARAMETERS, MODEL_COLUMNS_PATH, MODEL_PATH, predict_with_intervals
+from stations import DATA_PATH
+
+WARMUP_INTERVAL = float(os.environ.get("AQUAWATCH_WARMUP_INTERVAL", 3600))
+# Readiness is opt-in and local by default; set the host to 0.0.0.0 for an external load balancer
+READY_PORT = int(os.environ.get("AQUAWATCH_READY_PORT", 0))
+READY_HOST = os.environ.get("AQUAWATCH_READY_HOST", "127.0.0.1")
+
+
+def smoke_prediction(model, encoder, year=2022):
+    """Predict every trained station for one year and check the output is sane"""
+    station_ids = encoder.station_ids
+    point, lower, upper = predict_with_intervals(model, encoder.transform([year] * len(station_ids), station_ids))
+    if point.shape != (len(station_ids), len(FORECAST_PARAMETERS)):
+        raise ValueError(f"smoke prediction has shape {point.shape}, expected ({len(station_ids)}, {len(FORECAST_PARAMETERS)})")
+    if not (np.isfinite(point).all() and np.isfinite(lower).all() and np.isfinite(upper).all()):
+        raise ValueError("smoke prediction contains non-finite values")
+    if (lower < 0).any():
+        raise ValueError("smoke prediction contains negative concentrations")
+    # The forecast is the median tree, so it lies within its quantile interval by construction
+    if not ((lower <= point) & (point <= upper)).all():
+        raise ValueError("smoke prediction falls outside its own interval")
+
+
+def warm_up():
+    """Materialize every cache the dashboard uses; returns per-step timings in seconds"""
+    timings = {}
+
+    def step(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        timings[name] = time.perf_counter() - start
+        return result
+
+    with caches.quiet_bare_mode():
+        model, encoder = step("model", caches.get_forecast_model)
+        step("smoke_prediction", lambda: smoke_prediction(model, encoder))
+        df = step("measurements", caches.get_measurements)
+        df_enhanced = step("enrichment", caches.get_enhanced_measurements)
+        step("station_means", caches.get_station_means)
+        step("anomalies", lambda: caches.detect_anomalies(df, caches.DEFAULT_ANOMALY_THRESHOLD))
+        step("station_index", lambda: caches.build_station_index(df_enhanced))
+        step("climatology", lambda: caches.build_climatology(df))
+        step("correlation", lambda: caches.build_correlation_engine(df))
+    return timings
+
+
+class WarmupScheduler(threading.Thread):
+    """Background thread running warm_up() on startup and every `interval` seconds"""
+
+    def __init__(self, interval=WARMUP_INTERVAL, watched_files=(MODEL_PATH, MODEL_COLUMNS_PATH, ENCODER_PATH, DATA_PATH)):
+        super().__init__(name="cache-warmup", daemon=True)
+        self.interval = interval
+        self.watched_files = watched_files
+        self.ready = False
+        self.status = {'ready': False, 'state': 'starting'}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._mtimes = None
+
+    def _file_mtimes(self):
+        return {path: os.path.getmtime(path) for path in self.watched_files if os.path.exists(path)}
+
+    def _wait_for_runtime(self, timeout=30):
+        """Under `streamlit run`, warm into the server's caches once its runtime exists"""
+        try:
+            from streamlit.runtime import Runtime
+        except ImportError:
+            return
+        deadline = time.monotonic() + timeout
+        while not Runtime.exists() and time.monotonic() < deadline and not self._stop_event.is_set():
+            time.sleep(0.1)
+
+    def run_once(self):
+        mtimes = self._file_mtimes()
+        if self._mtimes is not None and mtimes != self._mtimes:
+            # Model or data changed on disk: stop advertising readiness and rebuild from scratch
+            with self._lock:
+                self.ready = False
+                self.status = {**self.status, 'ready': False, 'state': 'reloading'}
+            caches.clear_all()
+
+        started = time.time()
+        try:
+            timings = warm_up()
+        except Exception as e:
+            with self._lock:
+                self.ready = False
+                self.status = {'ready': False, 'state': 'failed', 'error': f"{type(e).__name__}: {e}",
+                               'last_run': started}
+            print(f"❌ Warm-up failed: {e}", file=sys.stderr)
+            return False
+
+        self._mtimes = mtimes
+        with self._lock:
+            self.ready = True
+            self.status = {'ready': True, 'state': 'ready', 'last_run': started,
+                           'duration_s': sum(timings.values()), 'steps_s': timings}
+        print(f"✅ Instance warm in {sum(timings.values()):.2f}s ({', '.join(f'{k} {v:.2f}s' for k, v in timings.items())})")
+        return True
+
+    def run(self):
+        self._wait_for_runtime()
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.status)
+
+
+def start_readiness_server(scheduler, port, host=READY_HOST):
+    """Serve /ready and /live for the scheduler in a background thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/ready"):
+                status = scheduler.snapshot()
+                self._reply(200 if status['ready'] else 503, status)
+            elif self.path.startswith("/live"):
+                self._reply(200, {'alive': True})
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def _reply(self, code, body):
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="readiness", daemon=True).start()
+    return server
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def ensure_started(interval=WARMUP_INTERVAL, ready_port=None, ready_host=READY_HOST):
+    """Start the scheduler once per process, and the readiness server when given a port
+
+    app.py calls this without a port: by the time the script runs a session is
+    already being served, so readiness would never gate anything. `serve`
+    starts it before Streamlit and passes the port.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = WarmupScheduler(interval)
+            _scheduler.start()
+            if ready_port:
+                try:
+                    start_readiness_server(_scheduler, ready_port, ready_host)
+                except OSError as e:
+                    print(f"⚠️ Readiness check not served on {ready_host}:{ready_port}: {e}", file=sys.stderr)
+            elif READY_PORT:
+                print("⚠️ AQUAWATCH_READY_PORT is ignored under `streamlit run`; launch with `python warmup.py serve` "
+                      "to serve the readiness check", file=sys.stderr)
+        return _scheduler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm the dashboard caches and serve a readiness check")
+    parser.add_argument("command", nargs="?", choices=["serve"], help="Launch the dashboard in this process after starting the warm-up")
+    parser.add_argument("--once", action="store_true", help="Run a single warm-up and smoke test, then exit")
+    parser.add_argument("--interval", type=float, default=WARMUP_INTERVAL, help="Seconds between warm-up runs")
+    parser.add_argument("--ready-port", type=int, default=READY_PORT, help="Serve /ready and /live on this port with `serve` (default: off)")
+    parser.add_argument("--ready-host", default=READY_HOST, help="Interface for the readiness check")
+    # Anything after `--` is passed through to `streamlit run app.py`
+    args, streamlit_args = parser.parse_known_args(argv)
+    streamlit_args = [arg for arg in streamlit_args if arg != "--"]
+    if streamlit_args and args.command != "serve":
+        parser.error(f"unrecognized arguments: {' '.join(streamlit_args)}")
+
+    if args.once or args.command is None:
+        scheduler = WarmupScheduler(args.interval)
+        ok = scheduler.run_once()
+        print(json.dumps(scheduler.snapshot(), indent=2))
+        return 0 if ok else 1
+
+    # Same process as the Streamlit server, so the warmed caches are the ones sessions hit.
+    # Register this module under its import name so app.py's ensure_started() finds the running scheduler.
+    sys.modules.setdefault("warmup", sys.modules[__name__])
+    ensure_started(args.interval, args.ready_port, args.ready_host)
+    from streamlit.web import cli as stcli
+    sys.argv = ["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")] + streamlit_args
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())